@@ -1,143 +1,349 @@
 import shutil
 import os
+import sys
+import stat
+import errno
+import functools
+import inspect
+import ntpath
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import IO, Callable, List, Optional, Tuple, Union
-import winreg
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+try:
+    import posix
+except ImportError:
+    posix = None
+
+try:
+    import _winapi
+except ImportError:
+    _winapi = None
+
+_IS_NT = os.name == "nt"
+_PREFIX = "\\\\?\\"
+# MAX_PATH minus room for an 8.3 file name, the limit for directories
+_MAX_PATH_UNPREFIXED = 247
+_UNC_STARTS = ("\\\\", "//", "\\/", "/\\")
+
+_FS_KEY = r"SYSTEM\CurrentControlSet\Control\FileSystem"
+
+_HAS_FCOPYFILE = posix is not None and hasattr(posix, "_fcopyfile")
+_HAS_COPYFILE2 = _winapi is not None and hasattr(_winapi, "CopyFile2")
+_USE_SENDFILE = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+_SENDFILE_BLOCKSIZE = 2 ** 30
+_PREALLOCATE_MIN_SIZE = 64 * 1024 * 1024
+# FileEndOfFileInfo of FILE_INFO_BY_HANDLE_CLASS
+_FILE_END_OF_FILE_INFO = 6
+
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_PARALLEL_THRESHOLD = 16
+_BATCH_SIZE = 256
 
 def enable_long_paths_on_registry():
     """
     Enables long path support in Windows by modifying the Windows registry.
     This requires administrative privileges and does not always work.
     """
-    key = winreg.OpenKey(
-        winreg.HKEY_LOCAL_MACHINE,
-        r"SYSTEM\\CurrentControlSet\\Control\\FileSystem",
-        0,
-        winreg.KEY_WRITE,
-    )
-    winreg.SetValueEx(key, "LongPathsEnabled", 0, winreg.REG_DWORD, 1)
-    winreg.CloseKey(key)
+    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, _FS_KEY, 0, winreg.KEY_WRITE) as key:
+        winreg.SetValueEx(key, "LongPathsEnabled", 0, winreg.REG_DWORD, 1)
+    is_long_paths_enabled_on_registry.cache_clear()
 
 def disable_long_paths_on_registry():
     """
     Disables long path support in Windows by modifying the Windows registry.
     This requires administrative privileges.
     """
-    key = winreg.OpenKey(
-        winreg.HKEY_LOCAL_MACHINE,
-        r"SYSTEM\\CurrentControlSet\\Control\\FileSystem",
-        0,
-        winreg.KEY_WRITE,
-    )
-    winreg.SetValueEx(key, "LongPathsEnabled", 0, winreg.REG_DWORD, 0)
-    winreg.CloseKey(key)
+    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, _FS_KEY, 0, winreg.KEY_WRITE) as key:
+        winreg.SetValueEx(key, "LongPathsEnabled", 0, winreg.REG_DWORD, 0)
+    is_long_paths_enabled_on_registry.cache_clear()
     return True
 
+@functools.lru_cache(maxsize=1)
 def is_long_paths_enabled_on_registry():
     """
     Checks if long path support is enabled in Windows.
 
+    The result is cached; enable_long_paths_on_registry and
+    disable_long_paths_on_registry clear the cache.
+
     Returns:
         bool: True if long paths are enabled, False otherwise.
     """
-    key = winreg.OpenKey(
-        winreg.HKEY_LOCAL_MACHINE,
-        r"SYSTEM\\CurrentControlSet\\Control\\FileSystem",
-        0,
-        winreg.KEY_READ,
-    )
-    value, _ = winreg.QueryValueEx(key, "LongPathsEnabled")
-    winreg.CloseKey(key)
+    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, _FS_KEY, 0, winreg.KEY_READ) as key:
+        value, _ = winreg.QueryValueEx(key, "LongPathsEnabled")
     return value == 1
 
-def add_long_path_prefix(path: Union[str, Path]) -> str:
+def add_long_path_prefix(path: Union[str, Path], *, force: bool = False) -> str:
     """
     Adds the \\?\ prefix to an absolute path if it isn't already present.
+    UNC paths get the \\\\?\\UNC\\ form.
+
+    Paths shorter than the MAX_PATH limit are returned unchanged, as the prefix
+    turns off Windows path normalization. Callers that walk a tree below the
+    path (where the children can exceed the limit) should pass force.
+    Prefixed paths are normalized first, as Windows won't do it for them.
 
     Args:
         path (Union[str, Path]): The path to add the prefix to.
+        force (bool, optional): Prefix absolute paths regardless of their length. Defaults to False.
 
     Returns:
         str: The path with the \\?\ prefix added, if applicable.
     """
-    prefix = "\\\\?\\"
-    path = str(path)
-    if os.name == "nt":
-        if not path.startswith(prefix):
-            p = Path(path)
-            if p.name == path:
-                return path
-            if p.is_absolute():
-                return prefix + path
-            else:
-                return path
-
-    return path
-
-def copyfileobj(fsrc: IO[bytes], fdst: IO[bytes], length: int = 16 * 1024) -> None:
+    s = path if type(path) is str else str(path)
+    if not _IS_NT:
+        return s
+    return _prefix_str(s, force)
+
+@functools.lru_cache(maxsize=8192)
+def _prefix_str(s: str, force: bool) -> str:
+    """
+    Does the work of add_long_path_prefix on Windows. Cached on the string,
+    as the same roots get prefixed over and over.
+    """
+    if s.startswith(_PREFIX):
+        return s
+    if not force and len(s) < _MAX_PATH_UNPREFIXED:
+        return s
+    # only drive and UNC paths; bare file names, relative and root-relative
+    # paths (which ntpath.isabs accepts before Python 3.13) are left alone
+    if not ntpath.isabs(s):
+        return s
+    if s[1:2] == ":":
+        return _PREFIX + ntpath.normpath(s)
+    if s[:2] in _UNC_STARTS:
+        if s[2:3] in ("?", ".") and s[3:4] in ("\\", "/"):
+            # already a device path, e.g. \\.\pipe\name
+            return s
+        # \\server\share\... takes the form \\?\UNC\server\share\...
+        return _PREFIX + "UNC" + ntpath.normpath(s)[1:]
+    return s
+
+def copyfileobj(fsrc: IO[bytes], fdst: IO[bytes], length: int = 1024 * 1024) -> None:
     """
     Copies the contents of one file object to another.
 
+    A single buffer is allocated up front and filled with readinto, so no
+    new bytes object is created per chunk.
+
     Args:
         fsrc (IO[bytes]): Source file object.
         fdst (IO[bytes]): Destination file object.
-        length (int, optional): Number of bytes per read. Defaults to 16 * 1024.
-    """
-    return shutil.copyfileobj(fsrc, fdst, length)
+        length (int, optional): Number of bytes per read. Defaults to 1024 * 1024.
+    """
+    if not length or length < 0:
+        length = 1024 * 1024
+    fsrc_readinto = getattr(fsrc, "readinto", None)
+    if fsrc_readinto is None:
+        return shutil.copyfileobj(fsrc, fdst, length)
+    fdst_write = fdst.write
+    with memoryview(bytearray(length)) as mv:
+        while True:
+            n = fsrc_readinto(mv)
+            if not n:
+                break
+            elif n < length:
+                with mv[:n] as smv:
+                    fdst_write(smv)
+            else:
+                fdst_write(mv)
 
-def copyfile(
-    src: Union[str, Path], dst: Union[str, Path], *, follow_symlinks: bool = True
-) -> str:
+def _fastcopy_fcopyfile(fsrc: IO[bytes], fdst: IO[bytes]) -> bool:
     """
-    Copies the contents of a file to another file.
-
-    Args:
-        src (Union[str, Path]): Source file path.
-        dst (Union[str, Path]): Destination file path.
-        follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
+    Copies the file data in-kernel with fcopyfile(3) (macOS only).
 
     Returns:
-        str: The destination file path.
-    """
-    src = add_long_path_prefix(src)
-    dst = add_long_path_prefix(dst)
-    return shutil.copyfile(src, dst, follow_symlinks=follow_symlinks)
+        bool: True if the data was copied, False if the caller should fall back to copyfileobj.
+    """
+    try:
+        posix._fcopyfile(fsrc.fileno(), fdst.fileno(), posix._COPYFILE_DATA)
+    except OSError as err:
+        if err.errno in (errno.EINVAL, errno.ENOTSUP):
+            return False
+        err.filename, err.filename2 = fsrc.name, fdst.name
+        raise
+    return True
 
-def copymode(
-    src: Union[str, Path], dst: Union[str, Path], *, follow_symlinks: bool = True
-) -> None:
+def _fastcopy_sendfile(fsrc: IO[bytes], fdst: IO[bytes]) -> bool:
     """
-    Copies the permission bits from the source to the destination.
+    Copies the file data in-kernel with sendfile(2) (Linux only).
 
-    Args:
-        src (Union[str, Path]): Source file path.
-        dst (Union[str, Path]): Destination file path.
-        follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
-    """
-    src = add_long_path_prefix(src)
-    dst = add_long_path_prefix(dst)
-    shutil.copymode(src, dst, follow_symlinks=follow_symlinks)
+    Returns:
+        bool: True if the data was copied, False if the caller should fall back to copyfileobj.
+    """
+    infd = fsrc.fileno()
+    outfd = fdst.fileno()
+    copied = 0
+    while True:
+        try:
+            sent = os.sendfile(outfd, infd, None, _SENDFILE_BLOCKSIZE)
+        except OSError as err:
+            if copied == 0 and err.errno in (errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK):
+                return False
+            err.filename, err.filename2 = fsrc.name, fdst.name
+            raise
+        if sent == 0:
+            return True
+        copied += sent
+
+@functools.lru_cache(maxsize=1)
+def _load_fallocate() -> Optional[Callable[[int, int], None]]:
+    """
+    Looks up the native call that sizes a file without writing its contents:
+    fallocate(2) on Linux and SetFileInformationByHandle(FileEndOfFileInfo)
+    on Windows. posix_fallocate is not used as glibc emulates it by writing
+    every block (e.g. on NFS or FUSE), and neither is os.ftruncate, which
+    zero-fills the new bytes on Windows. Loaded on first use, so ctypes is
+    only imported once a large file gets copied.
 
-def copystat(
-    src: Union[str, Path], dst: Union[str, Path], *, follow_symlinks: bool = True
-) -> None:
+    Returns:
+        Optional[Callable[[int, int], None]]: A function taking a file descriptor and a size,
+        raising OSError on failure, or None where there is no such call.
+    """
+    if not (_IS_NT or sys.platform.startswith("linux")):
+        return None
+    try:
+        import ctypes
+    except ImportError:
+        return None
+
+    if _IS_NT:
+        import msvcrt
+
+        try:
+            set_info = ctypes.WinDLL("kernel32", use_last_error=True).SetFileInformationByHandle
+        except (OSError, AttributeError):
+            return None
+        set_info.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_ulong]
+        set_info.restype = ctypes.c_int
+
+        def fallocate(fd: int, size: int) -> None:
+            # FILE_END_OF_FILE_INFO is a single LARGE_INTEGER
+            info = ctypes.c_int64(size)
+            handle = msvcrt.get_osfhandle(fd)
+            if not set_info(handle, _FILE_END_OF_FILE_INFO, ctypes.byref(info), ctypes.sizeof(info)):
+                raise ctypes.WinError(ctypes.get_last_error())
+
+        return fallocate
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    func = getattr(libc, "fallocate64", None)
+    if func is None and ctypes.sizeof(ctypes.c_long) == 8:
+        func = getattr(libc, "fallocate", None)
+    if func is None:
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    func.restype = ctypes.c_int
+
+    def fallocate(fd: int, size: int) -> None:
+        if func(fd, 0, 0, size) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    return fallocate
+
+def _preallocate(st: os.stat_result, fdst: IO[bytes]) -> bool:
+    """
+    Sizes the destination to a large regular source file (of stat result st)
+    before copying, so the file system can allocate it in one go instead of
+    growing it per write.
+
+    Returns:
+        bool: True if the destination was preallocated.
+    """
+    if not stat.S_ISREG(st.st_mode) or st.st_size < _PREALLOCATE_MIN_SIZE:
+        return False
+    fallocate = _load_fallocate()
+    if fallocate is None:
+        return False
+    try:
+        fallocate(fdst.fileno(), st.st_size)
+    except OSError as err:
+        if err.errno == errno.ENOSPC:
+            raise
+        return False
+    return True
+
+def _copyfile(src: str, dst: str, *, follow_symlinks: bool = True) -> str:
     """
-    Copies the metadata from the source to the destination.
+    Copies the contents of a file to another file, in-kernel with sendfile
+    on Linux and fcopyfile on macOS. Elsewhere, Windows included, it falls
+    back to the copyfileobj loop. Expects already prefixed paths.
 
     Args:
-        src (Union[str, Path]): Source file path.
-        dst (Union[str, Path]): Destination file path.
+        src (str): Source file path.
+        dst (str): Destination file path.
         follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
+
+    Returns:
+        str: The destination file path.
     """
-    src = add_long_path_prefix(src)
-    dst = add_long_path_prefix(dst)
-    shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+    sys.audit("shutil.copyfile", src, dst)
+    try:
+        same = os.path.samefile(src, dst)
+    except OSError:
+        same = False
+    if same:
+        raise shutil.SameFileError("{!r} and {!r} are the same file".format(src, dst))
+
+    for fn in (src, dst):
+        try:
+            st = os.stat(fn)
+        except OSError:
+            continue
+        if stat.S_ISFIFO(st.st_mode):
+            raise shutil.SpecialFileError("`%s` is a named pipe" % fn)
+
+    if not follow_symlinks and os.path.islink(src):
+        os.symlink(os.readlink(src), dst)
+        return dst
+
+    with open(src, "rb") as fsrc:
+        try:
+            st = os.fstat(fsrc.fileno())
+        except OSError:
+            st = None
+        try:
+            with open(dst, "wb") as fdst:
+                preallocated = st is not None and _preallocate(st, fdst)
+                try:
+                    copied = (_HAS_FCOPYFILE and _fastcopy_fcopyfile(fsrc, fdst)) or (
+                        _USE_SENDFILE and _fastcopy_sendfile(fsrc, fdst)
+                    )
+                    if not copied:
+                        # no bigger buffer than the file needs, as shutil does
+                        copyfileobj(fsrc, fdst, min(st.st_size, 1024 * 1024) if st else 0)
+                    fdst.flush()
+                finally:
+                    if preallocated:
+                        # cut off what wasn't written, in case the source shrank
+                        # or the copy failed, so no zero-filled tail is left
+                        outfd = fdst.fileno()
+                        os.ftruncate(outfd, os.lseek(outfd, 0, os.SEEK_CUR))
+        except IsADirectoryError as e:
+            if not os.path.exists(dst):
+                raise FileNotFoundError(f"Directory does not exist: {dst}") from e
+            raise
+    return dst
 
-def copy(
+def copyfile(
     src: Union[str, Path], dst: Union[str, Path], *, follow_symlinks: bool = True
 ) -> str:
     """
-    Copies a file to another location, preserving metadata.
+    Copies the contents of a file to another file.
+
+    Instead of going through shutil, the data is copied with the platform's
+    in-kernel primitive (sendfile on Linux, fcopyfile on macOS) and only falls
+    back to copyfileobj where none is available.
 
     Args:
         src (Union[str, Path]): Source file path.
@@ -149,25 +355,222 @@ def copy(
     """
     src = add_long_path_prefix(src)
     dst = add_long_path_prefix(dst)
-    return shutil.copy(src, dst, follow_symlinks=follow_symlinks)
+    return _copyfile(src, dst, follow_symlinks=follow_symlinks)
+
+def _copy(src: str, dst: str) -> str:
+    """
+    Copies the data and permission bits of a file, expecting already prefixed
+    paths and dst not being a directory.
+    """
+    _copyfile(src, dst)
+    shutil.copymode(src, dst)
+    return dst
+
+def _copy2(src: str, dst: str) -> str:
+    """
+    Copies the data and metadata of a file, expecting already prefixed paths
+    and dst not being a directory. Uses CopyFile2 where available, which
+    copies the whole file in one call without holding the GIL.
+    """
+    if _HAS_COPYFILE2:
+        try:
+            _winapi.CopyFile2(src, dst, _winapi.COPY_FILE_ALLOW_DECRYPTED_DESTINATION)
+            return dst
+        except OSError as exc:
+            # possibly a hidden or readonly file we can't overwrite
+            if exc.winerror != _winapi.ERROR_ACCESS_DENIED:
+                raise
+    _copyfile(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+# The paths copytree hands to copy_function are already prefixed, and unless
+# dirs_exist_ok is set (when dst can be an existing directory to copy into)
+# never directories. So the copy functions of this module and shutil can then
+# be swapped for ones skipping the prefixing and directory checks. Only _copy2 on Python
+# 3.12+ on Windows copies natively (CopyFile2); otherwise Windows workers run
+# the copyfileobj loop, which only releases the GIL during each read and write.
+_UNPREFIXED_COPY_FUNCTIONS = {
+    copyfile: _copyfile,
+    shutil.copyfile: _copyfile,
+    shutil.copy: _copy,
+    shutil.copy2: _copy2,
+}
+
+def _copytree_walk(
+    src: str,
+    dst: str,
+    symlinks: bool,
+    ignore: Optional[Callable[[str, List[str]], List[str]]],
+    ignore_dangling_symlinks: bool,
+) -> Tuple[List[Tuple[str, str]], ...]:
+    """
+    Walks the source tree once with os.scandir and collects the work copytree
+    has to do. The cached DirEntry type information saves a stat per entry.
 
-def copy2(
-    src: Union[str, Path], dst: Union[str, Path], *, follow_symlinks: bool = True
-) -> str:
+    Returns:
+        Tuple: The (src, dst) pairs of the directories in top-down order, of the
+        leaf directories, of the symlinks to recreate and of the files to copy,
+        plus the errors met while walking.
+    """
+    dirs, leaves, links, files, errors = [], [], [], [], []
+    stack = [(src, dst)]
+    while stack:
+        srcdir, dstdir = stack.pop()
+        try:
+            with os.scandir(srcdir) as itr:
+                entries = list(itr)
+        except OSError as why:
+            if srcdir == src:
+                raise
+            errors.append((srcdir, dstdir, str(why)))
+            # the parent was not recorded as a leaf, so make sure it gets created
+            leaves.append((os.path.dirname(srcdir), os.path.dirname(dstdir)))
+            continue
+        dirs.append((srcdir, dstdir))
+        if ignore is not None:
+            ignored_names = ignore(os.fspath(srcdir), [entry.name for entry in entries])
+        else:
+            ignored_names = ()
+
+        is_leaf = True
+        for entry in entries:
+            if entry.name in ignored_names:
+                continue
+            dstname = os.path.join(dstdir, entry.name)
+            is_symlink = entry.is_symlink()
+            if is_symlink and _IS_NT:
+                # directory junctions show up as symlinks but are copied as directories
+                lstat = entry.stat(follow_symlinks=False)
+                if lstat.st_reparse_tag == stat.IO_REPARSE_TAG_MOUNT_POINT:
+                    is_symlink = False
+            if is_symlink:
+                if symlinks:
+                    links.append((entry.path, dstname))
+                    continue
+                if not os.path.exists(entry.path):
+                    if not ignore_dangling_symlinks:
+                        files.append((entry.path, dstname))
+                    continue
+            if entry.is_dir():
+                stack.append((entry.path, dstname))
+                is_leaf = False
+            else:
+                files.append((entry.path, dstname))
+        if is_leaf:
+            leaves.append((srcdir, dstdir))
+    return dirs, leaves, links, files, errors
+
+def _map_threaded(
+    func: Callable, items: List, max_workers: Optional[int] = None
+) -> List[Tuple[object, OSError]]:
     """
-    Copies a file to another location, preserving metadata.
+    Calls func on each item, on a thread pool when there are enough items to
+    be worth it. The items are handed to the pool in batches, so the cost of
+    submitting a task is paid once per batch rather than once per item.
 
-    Args:
-        src (Union[str, Path]): Source file path.
-        dst (Union[str, Path]): Destination file path.
-        follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
+    Returns:
+        List[Tuple[object, OSError]]: (item, exception) for each failed call.
+    """
+
+    def call_batch(batch: List) -> List[Tuple[object, OSError]]:
+        failures = []
+        for item in batch:
+            try:
+                func(item)
+            except OSError as why:
+                failures.append((item, why))
+        return failures
+
+    if len(items) < _PARALLEL_THRESHOLD:
+        return call_batch(items)
+    # several batches per worker so a slow batch doesn't leave the others idle
+    max_workers = max_workers or _MAX_WORKERS
+    batch_size = min(_BATCH_SIZE, -(-len(items) // (max_workers * 4)))
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(call_batch, batches))
+    return [failure for failures in results for failure in failures]
+
+def _copy_pairs(
+    copy_function: Callable[[str, str], str],
+    pairs: List[Tuple[str, str]],
+    max_workers: Optional[int] = None,
+) -> List[Tuple[str, str, str]]:
+    """
+    Calls copy_function on each (src, dst) pair, in parallel.
 
     Returns:
-        str: The destination file path.
+        List[Tuple[str, str, str]]: (src, dst, error message) for each failed copy.
     """
-    src = add_long_path_prefix(src)
-    dst = add_long_path_prefix(dst)
-    return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+    failures = _map_threaded(
+        lambda pair: copy_function(pair[0], pair[1]), pairs, max_workers
+    )
+    return [(srcname, dstname, str(why)) for (srcname, dstname), why in failures]
+
+def _parallel_copytree(
+    trees: List[Tuple[str, str]],
+    symlinks: bool,
+    ignore: Optional[Callable[[str, List[str]], List[str]]],
+    copy_function: Callable[[str, str], str],
+    ignore_dangling_symlinks: bool,
+    dirs_exist_ok: bool,
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Copies each (src, dst) tree, expecting already prefixed paths. All trees
+    are walked first, so their files are copied from one shared pool.
+
+    Only the leaf directories are created, longest first, with one
+    os.makedirs each; their parents come along with them.
+    """
+    # fail before anything is created, not after some trees are set up
+    seen = set()
+    for _, dst in trees:
+        key = os.path.normcase(os.path.abspath(dst))
+        if key in seen:
+            raise ValueError("Destination directory given more than once: {!r}".format(dst))
+        seen.add(key)
+    if not dirs_exist_ok:
+        for _, dst in trees:
+            if os.path.lexists(dst):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+        copy_function = _UNPREFIXED_COPY_FUNCTIONS.get(copy_function, copy_function)
+
+    dirs, leaves, links, files, errors = [], [], [], [], []
+    for src, dst in trees:
+        for collected, found in zip(
+            (dirs, leaves, links, files, errors),
+            _copytree_walk(src, dst, symlinks, ignore, ignore_dangling_symlinks),
+        ):
+            collected.extend(found)
+
+    for src, dst in trees:
+        os.makedirs(dst, exist_ok=dirs_exist_ok)
+    for srcdir, dstdir in sorted(leaves, key=lambda leaf: len(leaf[1]), reverse=True):
+        try:
+            os.makedirs(dstdir, exist_ok=True)
+        except OSError as why:
+            errors.append((srcdir, dstdir, str(why)))
+
+    for srcname, dstname in links:
+        try:
+            os.symlink(os.readlink(srcname), dstname)
+            shutil.copystat(srcname, dstname, follow_symlinks=False)
+        except OSError as why:
+            errors.append((srcname, dstname, str(why)))
+
+    errors.extend(_copy_pairs(copy_function, files, max_workers))
+
+    for srcdir, dstdir in reversed(dirs):
+        try:
+            shutil.copystat(srcdir, dstdir)
+        except OSError as why:
+            # Copying file access times may fail on Windows
+            if getattr(why, "winerror", None) is None:
+                errors.append((srcdir, dstdir, str(why)))
+    if errors:
+        raise shutil.Error(errors)
 
 def copytree(
     src: Union[str, Path],
@@ -183,6 +586,9 @@ def copytree(
     """
     Recursively copy an entire directory tree rooted at src to a directory named dst.
 
+    The tree is walked once up front; the file copies are then run on a thread
+    pool, since they are dominated by per-file syscall latency.
+
     Args:
         src (Union[str, Path]): Source directory.
         dst (Union[str, Path]): Destination directory.
@@ -195,17 +601,64 @@ def copytree(
     Returns:
         str: Destination directory path.
     """
-    src = add_long_path_prefix(src)
-    dst = add_long_path_prefix(dst)
-    return shutil.copytree(
-        src,
-        dst,
-        symlinks=symlinks,
-        ignore=ignore,
-        copy_function=copy_function,
-        ignore_dangling_symlinks=ignore_dangling_symlinks,
-        dirs_exist_ok=dirs_exist_ok,
+    src = add_long_path_prefix(src, force=True)
+    dst = add_long_path_prefix(dst, force=True)
+    sys.audit("shutil.copytree", src, dst)
+    _parallel_copytree(
+        [(src, dst)], symlinks, ignore, copy_function, ignore_dangling_symlinks, dirs_exist_ok
+    )
+    return dst
+
+def copytree_many(
+    pairs: List[Tuple[Union[str, Path], Union[str, Path]]],
+    symlinks: bool = False,
+    ignore: Optional[Callable[[str, List[str]], List[str]]] = None,
+    copy_function: Callable[
+        [Union[str, Path], Union[str, Path]], str
+    ] = shutil.copy2,
+    ignore_dangling_symlinks: bool = False,
+    dirs_exist_ok: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Copies several directory trees, each (src, dst) pair as copytree would.
+
+    Unlike calling copytree per pair, all trees are walked (and ignore called
+    for all of their directories) before anything is created, and their files
+    are copied from a single thread pool. So a pair can't copy from the dst of
+    an earlier pair: [(a, b), (b, c)] fails where a copytree loop would not.
+    Every dst may only be given once, and unless dirs_exist_ok is set, all of
+    them are checked up front, so nothing is created if any of them exists.
+    The errors of all trees are raised together in one shutil.Error.
+
+    Args:
+        pairs (List[Tuple[Union[str, Path], Union[str, Path]]]): (source, destination) directory pairs.
+        symlinks (bool, optional): Whether to copy symlinks. Defaults to False.
+        ignore (Optional[Callable[[str, List[str]], List[str]]], optional): Ignore function. Defaults to None.
+        copy_function (Callable, optional): Copy function to use. Defaults to shutil.copy2.
+        ignore_dangling_symlinks (bool, optional): Ignore dangling symlinks. Defaults to False.
+        dirs_exist_ok (bool, optional): Whether destination directories can already exist. Defaults to False.
+        max_workers (Optional[int], optional): Number of copy threads. Defaults to None (min(32, cpu_count * 4)).
+
+    Returns:
+        List[str]: Destination directory paths.
+    """
+    trees = []
+    for src, dst in pairs:
+        src = add_long_path_prefix(src, force=True)
+        dst = add_long_path_prefix(dst, force=True)
+        sys.audit("shutil.copytree", src, dst)
+        trees.append((src, dst))
+    _parallel_copytree(
+        trees,
+        symlinks,
+        ignore,
+        copy_function,
+        ignore_dangling_symlinks,
+        dirs_exist_ok,
+        max_workers,
     )
+    return [dst for _, dst in trees]
 
 def move(
     src: Union[str, Path],
@@ -217,6 +670,11 @@ def move(
     """
     Moves a file or directory to another location.
 
+    On Windows a single os.replace (MoveFileExW) is tried first. It refuses to
+    replace directories and to move across volumes, so whenever it fails
+    shutil.move takes over with its usual semantics (and raises the
+    shutil.move audit event a second time).
+
     Args:
         src (Union[str, Path]): Source file or directory.
         dst (Union[str, Path]): Destination path.
@@ -225,10 +683,82 @@ def move(
     Returns:
         str: Destination path.
     """
-    src = add_long_path_prefix(src)
-    dst = add_long_path_prefix(dst)
+    src = add_long_path_prefix(src, force=True)
+    dst = add_long_path_prefix(dst, force=True)
+    if _IS_NT:
+        # before the move, so an audit hook can still veto it
+        sys.audit("shutil.move", src, dst)
+        try:
+            os.replace(src, dst)
+            return dst
+        except OSError:
+            pass
     return shutil.move(src, dst, copy_function=copy_function)
 
+def _rmtree_islink(st: os.stat_result) -> bool:
+    if stat.S_ISLNK(st.st_mode):
+        return True
+    # directory junctions are removed like symlinks, as shutil does
+    return bool(
+        getattr(st, "st_file_attributes", 0) & stat.FILE_ATTRIBUTE_REPARSE_POINT
+        and st.st_reparse_tag == stat.IO_REPARSE_TAG_MOUNT_POINT
+    )
+
+def _rmtree_threaded(path: str, onexc: Callable[[Callable, str, BaseException], None]) -> None:
+    """
+    Removes a directory tree, unlinking all files in parallel before removing
+    the directories bottom-up. Symlinks and junctions are unlinked, not followed.
+    The tree is walked with an explicit stack, so its depth is not limited by
+    the recursion limit. Errors are reported as shutil's own (unsafe) rmtree
+    reports them, and entries that vanish meanwhile are skipped.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError as err:
+        onexc(os.lstat, path, err)
+        return
+    try:
+        if _rmtree_islink(st):
+            raise OSError("Cannot call rmtree on a symbolic link")
+    except OSError as err:
+        onexc(os.path.islink, path, err)
+        return
+
+    dirs, files = [], []
+    stack = [path]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as itr:
+                entries = list(itr)
+        except OSError as err:
+            if not isinstance(err, FileNotFoundError):
+                onexc(os.scandir, dirpath, err)
+            entries = []
+        dirs.append(dirpath)
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and _IS_NT:
+                    is_dir = not _rmtree_islink(entry.stat(follow_symlinks=False))
+            except OSError:
+                is_dir = False
+            if is_dir:
+                stack.append(entry.path)
+            else:
+                files.append(entry.path)
+
+    for fullname, err in _map_threaded(os.unlink, files):
+        if not isinstance(err, FileNotFoundError):
+            onexc(os.unlink, fullname, err)
+    for fullname in reversed(dirs):
+        try:
+            os.rmdir(fullname)
+        except FileNotFoundError:
+            continue
+        except OSError as err:
+            onexc(os.rmdir, fullname, err)
+
 def rmtree(
     path: Union[str, Path],
     ignore_errors: bool = False,
@@ -239,6 +769,10 @@ def rmtree(
     """
     Removes a directory tree.
 
+    Where shutil.rmtree cannot protect against symlink attacks anyway (e.g. on
+    Windows), the files are unlinked on a thread pool, since deleting is
+    dominated by per-file latency rather than throughput.
+
     Args:
         path (Union[str, Path]): Path to the directory tree to be removed.
         ignore_errors (bool, optional): Ignore errors during removal. Defaults to False.
@@ -246,109 +780,162 @@ def rmtree(
         onexc (Optional[Callable], optional): Exception handling callback. Defaults to None.
         dir_fd (Optional[int], optional): Directory file descriptor. Defaults to None.
     """
-    path = add_long_path_prefix(path)
-    shutil.rmtree(path, ignore_errors=ignore_errors, onerror=onerror, onexc=onexc, dir_fd=dir_fd)
+    path = add_long_path_prefix(path, force=True)
+    if shutil.rmtree.avoids_symlink_attacks or dir_fd is not None:
+        shutil.rmtree(path, ignore_errors=ignore_errors, onerror=onerror, onexc=onexc, dir_fd=dir_fd)
+        return
+
+    sys.audit("shutil.rmtree", path, dir_fd)
+    if ignore_errors:
+        def onexc(*args):
+            pass
+    elif onexc is None:
+        if onerror is None:
+            def onexc(func, path, exc):
+                raise exc
+        else:
+            def onexc(func, path, exc):
+                return onerror(func, path, (type(exc), exc, exc.__traceback__))
+    _rmtree_threaded(path, onexc)
 
 rmtree.avoids_symlink_attacks = shutil.rmtree.avoids_symlink_attacks
 
-def disk_usage(path: Union[str, Path]) -> shutil._ntuple_diskusage:
-    """
-    Returns disk usage statistics about the given path.
+# These take no file system path, so they are shutil's own functions. (The
+# path parameter of which is a search PATH, not a file system path.)
+which = shutil.which
+get_archive_formats = shutil.get_archive_formats
+register_archive_format = shutil.register_archive_format
+unregister_archive_format = shutil.unregister_archive_format
+get_unpack_formats = shutil.get_unpack_formats
+register_unpack_format = shutil.register_unpack_format
+unregister_unpack_format = shutil.unregister_unpack_format
+ignore_patterns = shutil.ignore_patterns
+get_terminal_size = shutil.get_terminal_size
+
+# Parameters of the shutil functions that take a file system path, and those
+# of them below which a whole tree is read or written (see add_long_path_prefix).
+_PATH_PARAMS = {"src", "dst", "path", "filename"}
+_TREE_PATH_PARAMS = {"base_name", "root_dir", "base_dir", "extract_dir"}
+# Functions that join basename(src) onto a directory dst, which can take it
+# past the limit, so their dst is always prefixed.
+_DIR_DST_FUNCTIONS = {"copy", "copy2"}
+
+def _make_wrapper(name: str, doc: Optional[str] = None) -> Callable:
+    """
+    Generates a wrapper for the shutil function of the given name, with the
+    same signature, that prefixes its path arguments before forwarding.
+    The wrapper gets doc as docstring, or else the one of the shutil function.
+    """
+    func = getattr(shutil, name)
+    namespace = {"_pfx": add_long_path_prefix, "_func": func}
+    params, args, body = [], [], []
+    kinds = inspect.Parameter
+    for param in inspect.signature(func).parameters.values():
+        pname = param.name
+        if param.kind is kinds.VAR_POSITIONAL:
+            params.append("*" + pname)
+            args.append("*" + pname)
+            continue
+        if param.kind is kinds.VAR_KEYWORD:
+            params.append("**" + pname)
+            args.append("**" + pname)
+            continue
+        if param.kind is kinds.KEYWORD_ONLY and not any(p.startswith("*") for p in params):
+            params.append("*")
+        if param.kind is kinds.KEYWORD_ONLY:
+            args.append(f"{pname}={pname}")
+        else:
+            args.append(pname)
+
+        if param.default is param.empty:
+            params.append(pname)
+        else:
+            namespace["_default_" + pname] = param.default
+            params.append(f"{pname}=_default_{pname}")
+
+        if pname in _PATH_PARAMS or pname in _TREE_PATH_PARAMS:
+            force = pname in _TREE_PATH_PARAMS or (pname == "dst" and name in _DIR_DST_FUNCTIONS)
+            prefixed = f"_pfx({pname}, force=True)" if force else f"_pfx({pname})"
+            if param.default is None:
+                body.append(f"    if {pname} is not None:\n        {pname} = {prefixed}")
+            else:
+                body.append(f"    {pname} = {prefixed}")
+    if not body:
+        return func
 
-    Args:
-        path (Union[str, Path]): Path for which to check disk usage.
+    source = "def {}({}):\n{}\n    return _func({})\n".format(
+        name, ", ".join(params), "\n".join(body), ", ".join(args)
+    )
+    exec(source, namespace)
+    wrapper = namespace[name]
+    wrapper.__doc__ = func.__doc__ if doc is None else doc
+    wrapper.__module__ = __name__
+    return wrapper
 
-    Returns:
-        shutil._ntuple_diskusage: Disk usage statistics.
-    """
-    path = add_long_path_prefix(path)
-    return shutil.disk_usage(path)
+copymode = _make_wrapper("copymode", """
+    Copies the permission bits from the source to the destination.
 
-def chown(
-    path: Union[str, Path],
-    user: Optional[Union[int, str]] = None,
-    group: Optional[Union[int, str]] = None,
-    dir_fd: Optional[int] = None,
-    follow_symlinks: bool = True,
-) -> None:
-    """
-    Changes the owner and group of a file.
+    Args:
+        src (Union[str, Path]): Source file path.
+        dst (Union[str, Path]): Destination file path.
+        follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
+    """)
+
+copystat = _make_wrapper("copystat", """
+    Copies the metadata from the source to the destination.
 
     Args:
-        path (Union[str, Path]): Path to the file.
-        user (Optional[Union[int, str]], optional): New user owner. Defaults to None.
-        group (Optional[Union[int, str]], optional): New group owner. Defaults to None.
-        dir_fd (Optional[int], optional): A directory file descriptor. Defaults to None.
+        src (Union[str, Path]): Source file path.
+        dst (Union[str, Path]): Destination file path.
         follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
-    """
-    path = add_long_path_prefix(path)
-    shutil.chown(path, user=user, group=group, dir_fd=dir_fd, follow_symlinks=follow_symlinks)
+    """)
 
-def which(
-    cmd: str, mode: int = os.F_OK | os.X_OK, path: Optional[str] = None
-) -> Optional[str]:
-    """
-    Returns the path to an executable which would have been run if the given cmd was called.
+copy = _make_wrapper("copy", """
+    Copies a file to another location, preserving the permission bits.
 
     Args:
-        cmd (str): Command to check.
-        mode (int, optional): Accessibility check mode. Defaults to os.F_OK | os.X_OK.
-        path (Optional[str], optional): PATH environment variable to use. Defaults to None.
+        src (Union[str, Path]): Source file path.
+        dst (Union[str, Path]): Destination file or directory path.
+        follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
 
     Returns:
-        Optional[str]: Path to the executable, or None if not found.
-    """
-    return shutil.which(cmd, mode=mode, path=path)
+        str: The destination file path.
+    """)
 
-def get_archive_formats() -> List[Tuple[str, str]]:
-    """
-    Returns a list of supported archive formats.
+copy2 = _make_wrapper("copy2", """
+    Copies a file to another location, preserving metadata.
+
+    Args:
+        src (Union[str, Path]): Source file path.
+        dst (Union[str, Path]): Destination file or directory path.
+        follow_symlinks (bool, optional): Whether to follow symlinks. Defaults to True.
 
     Returns:
-        List[Tuple[str, str]]: List of (format_name, description) tuples.
-    """
-    return shutil.get_archive_formats()
+        str: The destination file path.
+    """)
 
-def register_archive_format(
-    name: str,
-    function: Callable,
-    extra_args: Optional[List] = None,
-    description: str = "",
-) -> None:
-    """
-    Registers an archive format.
+disk_usage = _make_wrapper("disk_usage", """
+    Returns disk usage statistics about the given path.
 
     Args:
-        name (str): Format name.
-        function (Callable): Function to create an archive.
-        extra_args (Optional[List], optional): Extra arguments for the archive creation function. Defaults to None.
-        description (str, optional): Format description. Defaults to ''.
-    """
-    shutil.register_archive_format(
-        name, function, extra_args=extra_args, description=description
-    )
+        path (Union[str, Path]): Path for which to check disk usage.
 
-def unregister_archive_format(name: str) -> None:
-    """
-    Unregisters an archive format.
+    Returns:
+        shutil._ntuple_diskusage: Disk usage statistics.
+    """)
+
+chown = _make_wrapper("chown", """
+    Changes the owner and group of a file.
 
     Args:
-        name (str): Format name to unregister.
-    """
-    shutil.unregister_archive_format(name)
-
-def make_archive(
-    base_name: Union[str, Path],
-    format: str,
-    root_dir: Optional[Union[str, Path]] = None,
-    base_dir: Optional[Union[str, Path]] = None,
-    verbose: int = 0,
-    dry_run: bool = False,
-    owner: Optional[Union[int, str]] = None,
-    group: Optional[Union[int, str]] = None,
-    logger: Optional[Callable[[str], None]] = None,
-) -> str:
-    """
+        path (Union[str, Path]): Path to the file.
+        user (Optional[Union[int, str]], optional): New user owner. Defaults to None.
+        group (Optional[Union[int, str]], optional): New group owner. Defaults to None.
+        dir_fd (Optional[int], optional): A directory file descriptor (Python 3.13+). Defaults to None.
+        follow_symlinks (bool, optional): Whether to follow symlinks (Python 3.13+). Defaults to True.
+    """)
+
+make_archive = _make_wrapper("make_archive", """
     Creates an archive file.
 
     Args:
@@ -364,103 +951,22 @@ def make_archive(
 
     Returns:
         str: Path to the created archive file.
-    """
-    base_name = add_long_path_prefix(base_name)
-    if root_dir:
-        root_dir = add_long_path_prefix(root_dir)
-    if base_dir:
-        base_dir = add_long_path_prefix(base_dir)
-    return shutil.make_archive(
-        base_name,
-        format,
-        root_dir=root_dir,
-        base_dir=base_dir,
-        verbose=verbose,
-        dry_run=dry_run,
-        owner=owner,
-        group=group,
-        logger=logger,
-    )
-
-def get_unpack_formats() -> List[Tuple[str, List[str], str]]:
-    """
-    Returns a list of supported unpack formats.
-
-    Returns:
-        List[Tuple[str, List[str], str]]: List of (format_name, extensions, description) tuples.
-    """
-    return shutil.get_unpack_formats()
-
-def register_unpack_format(
-    name: str,
-    extensions: List[str],
-    function: Callable,
-    extra_args: Optional[List] = None,
-    description: str = "",
-) -> None:
-    """
-    Registers an unpack format.
-
-    Args:
-        name (str): Format name.
-        extensions (List[str]): List of supported extensions.
-        function (Callable): Function to extract the archive.
-        extra_args (Optional[List], optional): Extra arguments for the extraction function. Defaults to None.
-        description (str, optional): Format description. Defaults to ''.
-    """
-    shutil.register_unpack_format(
-        name, extensions, function, extra_args=extra_args, description=description
-    )
-
-def unregister_unpack_format(name: str) -> None:
-    """
-    Unregisters an unpack format.
+    """)
 
-    Args:
-        name (str): Format name to unregister.
-    """
-    shutil.unregister_unpack_format(name)
-
-def unpack_archive(
-    filename: Union[str, Path],
-    extract_dir: Optional[Union[str, Path]] = None,
-    format: Optional[str] = None,
-    filter: Optional[str] = None,
-) -> None:
-    """
+unpack_archive = _make_wrapper("unpack_archive", """
     Unpacks an archive.
 
     Args:
         filename (Union[str, Path]): Archive file path.
         extract_dir (Optional[Union[str, Path]], optional): Directory to extract to. Defaults to None.
         format (Optional[str], optional): Archive format. Defaults to None.
-        filter (Optional[str], optional): Extraction filter for archive files. Defaults to None.
-    """
-    filename = add_long_path_prefix(filename)
-    if extract_dir:
-        extract_dir = add_long_path_prefix(extract_dir)
-    shutil.unpack_archive(filename, extract_dir=extract_dir, format=format, filter=filter)
+        filter (Optional[str], optional): Extraction filter for archive files, where supported. Defaults to None.
+    """)
 
-def ignore_patterns(*patterns: str) -> Callable[[str, List[str]], List[str]]:
-    """
-    Returns a callable that ignores files matching the given patterns.
-
-    Args:
-        patterns (str): Patterns to ignore.
-
-    Returns:
-        Callable[[str, List[str]], List[str]]: A callable that can be passed to ignore parameter of copytree.
-    """
-    return shutil.ignore_patterns(*patterns)
+# Whatever path-taking functions a newer shutil adds get a plain wrapper.
+for _name in shutil.__all__:
+    if _name not in globals() and inspect.isfunction(getattr(shutil, _name)):
+        globals()[_name] = _make_wrapper(_name)
+del _name
 
-def get_terminal_size(fallback: Tuple[int, int] = (80, 24)) -> os.terminal_size:
-    """
-    Returns the terminal size in characters.
-
-    Args:
-        fallback (Tuple[int, int], optional): Fallback size if terminal size cannot be determined. Defaults to (80, 24).
-
-    Returns:
-        os.terminal_size: Named tuple with terminal width and height.
-    """
-    return shutil.get_terminal_size(fallback=fallback)
+_UNPREFIXED_COPY_FUNCTIONS.update({copy: _copy, copy2: _copy2})
@@ -1,52 +1,20 @@
 import importlib
+import io
 import inspect
+import os
+import shutil
 import sys
-import types
-import requests
-from bs4 import BeautifulSoup
 
-def test_function_and_signatures():
-    response = requests.get(r"https://docs.python.org/3/library/shutil.html")
-    if response.status_code != 200:
-        raise ConnectionError(
-            "Could not download needed metadata from the official shutil documentation."
-        )
-
-    soup = BeautifulSoup(response.content, "html.parser")
-    source_links = soup.find_all("a", href=lambda href: href and href.endswith("shutil.py"))
-
-    if len(source_links) != 1:
-        raise ConnectionError(
-            "Could not find source code link on the official documentation."
-        )
-    
-    response2 = requests.get(source_links[0].attrs["href"])
-    if response2.status_code != 200:
-        raise ConnectionError("Could not download needed metadata from the shutil github.")
-
-    soup2 = BeautifulSoup(response2.content, "html.parser")
-    source_links2 = soup2.find_all(
-        "a", href=lambda href: href and "raw" in href and href.endswith("shutil.py")
-    )
-
-    if len(source_links2) == 0:
-        # somehow this link is sometimes not found, so providing a default
-        github_code_link = r"https://raw.githubusercontent.com/python/cpython/refs/heads/3.13/Lib/shutil.py"
-        # originally I was throwing this error: raise ConnectionError("Could not find raw source code link on github.")
-    else:
-        github_code_link = source_links2[0].attrs["href"]
+import pytest
 
-    response3 = requests.get(github_code_link)
-    if response3.status_code != 200:
-        raise ConnectionError("Could not download needed raw code from the shutil github.")
+import LongPathShutil
+from LongPathShutil import LongPathShutil as implementation
 
-    # create current official shutil module
-    module_name = "official_shutil"
-    new_module = types.ModuleType(module_name)
-    exec(response3.text, new_module.__dict__)
-    sys.modules[module_name] = new_module
-
-    # compare modules
+@pytest.mark.skipif(
+    sys.version_info < (3, 12), reason="rmtree follows the Python 3.12+ signature (onexc)"
+)
+def test_function_and_signatures():
+    # compare against the installed shutil, which is the one LongPathShutil forwards to
     def compare_modules(module1_name, module2_name):
         module1 = importlib.import_module(module1_name)
         module2 = importlib.import_module(module2_name)
@@ -103,5 +71,346 @@ def test_function_and_signatures():
         return True, "Modules are identical in terms of methods, classes, and attributes"
 
 
-    result, message = compare_modules("LongPathShutil", "official_shutil")
+    result, message = compare_modules("LongPathShutil", "shutil")
     assert result, message
+
+
+def _can_symlink(tmp_path):
+    try:
+        os.symlink(tmp_path, tmp_path / "symlink_probe")
+    except (OSError, NotImplementedError):
+        return False
+    os.unlink(tmp_path / "symlink_probe")
+    return True
+
+def _snapshot(root):
+    """Relative path -> (kind, content or link target) for everything below root."""
+    result = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root)
+            if os.path.islink(path):
+                result[rel] = ("link", os.readlink(path))
+            elif os.path.isdir(path):
+                result[rel] = ("dir", None)
+            else:
+                with open(path) as f:
+                    result[rel] = ("file", f.read())
+    return result
+
+def _make_tree(root, n_files=40):
+    os.makedirs(root / "a" / "b" / "c")
+    os.makedirs(root / "skip")
+    os.makedirs(root / "empty")
+    for i in range(n_files):
+        parent = root / "a" if i % 2 else root / "a" / "b" / "c"
+        (parent / f"f{i}.txt").write_text("x" * i)
+    (root / "keep.pyc").write_text("pyc")
+    (root / "skip" / "inner.txt").write_text("skipped")
+    return root
+
+@pytest.fixture
+def tree(tmp_path):
+    return _make_tree(tmp_path / "src")
+
+def _compare_copytree(tmp_path, src, **kwargs):
+    expected, actual = tmp_path / "expected", tmp_path / "actual"
+    shutil.copytree(src, expected, **kwargs)
+    result = LongPathShutil.copytree(src, actual, **kwargs)
+    assert os.path.samefile(result, actual)
+    assert _snapshot(actual) == _snapshot(expected)
+
+def test_copytree_matches_shutil(tmp_path, tree):
+    # enough files for the thread pool to be used
+    assert implementation._PARALLEL_THRESHOLD < 40
+    _compare_copytree(tmp_path, tree)
+
+def test_copytree_ignore(tmp_path, tree):
+    _compare_copytree(tmp_path, tree, ignore=shutil.ignore_patterns("*.pyc", "skip"))
+
+def test_copytree_symlinks(tmp_path, tree):
+    if not _can_symlink(tmp_path):
+        pytest.skip("symlinks are not supported")
+    # absolute targets, as shutil resolves relative ones against the cwd for
+    # ignore_dangling_symlinks
+    os.symlink(tree / "a", tree / "dirlink")
+    os.symlink(tree / "a" / "f1.txt", tree / "filelink")
+    os.symlink(tree / "missing", tree / "dangling")
+
+    _compare_copytree(tmp_path, tree, symlinks=True)
+    shutil.rmtree(tmp_path / "expected")
+    shutil.rmtree(tmp_path / "actual")
+    _compare_copytree(tmp_path, tree, ignore_dangling_symlinks=True)
+
+def test_copytree_collects_errors(tmp_path, tree):
+    if not _can_symlink(tmp_path):
+        pytest.skip("symlinks are not supported")
+    os.symlink(tree / "missing", tree / "dangling")
+
+    with pytest.raises(shutil.Error) as expected:
+        shutil.copytree(tree, tmp_path / "expected")
+    with pytest.raises(shutil.Error) as actual:
+        LongPathShutil.copytree(tree, tmp_path / "actual")
+
+    def failed(exc_info, root):
+        return sorted(os.path.relpath(error[0], root) for error in exc_info.value.args[0])
+
+    assert failed(actual, LongPathShutil.add_long_path_prefix(tree, force=True)) == failed(expected, tree)
+    # everything else was still copied
+    assert _snapshot(tmp_path / "actual") == _snapshot(tmp_path / "expected")
+
+def test_copytree_dirs_exist_ok(tmp_path, tree):
+    dst = tmp_path / "dst"
+    os.makedirs(dst / "a")
+    (dst / "a" / "f1.txt").write_text("old")
+    (dst / "other.txt").write_text("other")
+
+    with pytest.raises(FileExistsError):
+        LongPathShutil.copytree(tree, dst)
+
+    LongPathShutil.copytree(tree, dst, dirs_exist_ok=True)
+    snapshot = _snapshot(dst)
+    assert snapshot["a/f1.txt".replace("/", os.sep)] == ("file", "x")
+    assert snapshot["other.txt"] == ("file", "other")
+    assert snapshot["a/b/c/f38.txt".replace("/", os.sep)] == ("file", "x" * 38)
+
+def test_copytree_missing_source(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        LongPathShutil.copytree(tmp_path / "missing", tmp_path / "dst")
+    assert not os.path.exists(tmp_path / "dst")
+
+@pytest.fixture
+def threaded_rmtree(monkeypatch):
+    # rmtree only removes trees itself where shutil.rmtree is not symlink-attack resistant
+    monkeypatch.setattr(shutil.rmtree, "avoids_symlink_attacks", False)
+    return LongPathShutil.rmtree
+
+def test_rmtree_threaded(tmp_path, tree, threaded_rmtree):
+    keep = tmp_path / "keep"
+    os.makedirs(keep)
+    (keep / "k.txt").write_text("k")
+    if _can_symlink(tmp_path):
+        os.symlink(keep, tree / "a" / "dirlink", target_is_directory=True)
+
+    threaded_rmtree(tree)
+    assert not os.path.exists(tree)
+    assert os.listdir(keep) == ["k.txt"]
+
+def test_rmtree_threaded_symlink_root(tmp_path, tree, threaded_rmtree):
+    if not _can_symlink(tmp_path):
+        pytest.skip("symlinks are not supported")
+    link = tmp_path / "link"
+    os.symlink(tree, link, target_is_directory=True)
+
+    with pytest.raises(OSError):
+        threaded_rmtree(link)
+    calls = []
+    threaded_rmtree(link, onexc=lambda *args: calls.append(args))
+    assert [(func, path) for func, path, _ in calls] == [(os.path.islink, str(link))]
+    assert os.path.exists(tree / "a" / "f1.txt")
+
+def test_rmtree_threaded_error_handlers(tmp_path, threaded_rmtree):
+    missing = tmp_path / "missing"
+
+    with pytest.raises(FileNotFoundError):
+        threaded_rmtree(missing)
+    threaded_rmtree(missing, ignore_errors=True)
+
+    onexc_calls = []
+    threaded_rmtree(missing, onexc=lambda *args: onexc_calls.append(args))
+    assert len(onexc_calls) == 1
+    func, path, exc = onexc_calls[0]
+    assert func is os.lstat and path == str(missing)
+    assert isinstance(exc, FileNotFoundError)
+
+    onerror_calls = []
+    threaded_rmtree(missing, onerror=lambda *args: onerror_calls.append(args))
+    assert len(onerror_calls) == 1
+    func, path, exc_info = onerror_calls[0]
+    assert func is os.lstat and exc_info[0] is FileNotFoundError
+
+def test_rmtree_threaded_vanished_entries(tree, threaded_rmtree, monkeypatch):
+    unlink, rmdir = os.unlink, os.rmdir
+
+    def racing_unlink(path):
+        # someone else removes the file first
+        unlink(path)
+        unlink(path)
+
+    def racing_rmdir(path):
+        rmdir(path)
+        rmdir(path)
+
+    monkeypatch.setattr(os, "unlink", racing_unlink)
+    monkeypatch.setattr(os, "rmdir", racing_rmdir)
+    calls = []
+    threaded_rmtree(tree, onexc=lambda *args: calls.append(args))
+    assert calls == []
+    assert not os.path.exists(tree)
+
+@pytest.fixture
+def nt_prefix(monkeypatch):
+    monkeypatch.setattr(implementation, "_IS_NT", True)
+    return LongPathShutil.add_long_path_prefix
+
+def test_add_long_path_prefix(nt_prefix):
+    assert nt_prefix("C:\\a\\b") == "C:\\a\\b"
+    assert nt_prefix("C:/a/b", force=True) == "\\\\?\\C:\\a\\b"
+    assert nt_prefix("C:\\a\\..\\b\\.\\c", force=True) == "\\\\?\\C:\\b\\c"
+    assert nt_prefix("\\\\?\\C:\\a", force=True) == "\\\\?\\C:\\a"
+    assert nt_prefix("a\\b", force=True) == "a\\b"
+    assert nt_prefix("\\a\\b", force=True) == "\\a\\b"
+    long_path = "C:\\" + "a" * 300
+    assert nt_prefix(long_path) == "\\\\?\\" + long_path
+
+def test_add_long_path_prefix_unc(nt_prefix):
+    assert nt_prefix("\\\\server\\share\\a", force=True) == "\\\\?\\UNC\\server\\share\\a"
+    assert nt_prefix("//server/share/a/../b", force=True) == "\\\\?\\UNC\\server\\share\\b"
+    assert nt_prefix("\\\\?\\UNC\\server\\share", force=True) == "\\\\?\\UNC\\server\\share"
+    assert nt_prefix("\\\\.\\pipe\\name", force=True) == "\\\\.\\pipe\\name"
+
+def test_copy_wrappers_force_dst(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        implementation, "add_long_path_prefix", lambda path, force=False: calls.append((path, force)) or path
+    )
+    for name in ("copy", "copy2"):
+        monkeypatch.setattr(shutil, name, lambda src, dst, *, follow_symlinks=True: dst)
+        del calls[:]
+        implementation._make_wrapper(name)("src", "dst")
+        assert calls == [("src", False), ("dst", True)]
+
+def test_copyfile_preallocated(tmp_path, monkeypatch):
+    monkeypatch.setattr(implementation, "_PREALLOCATE_MIN_SIZE", 0)
+    src = tmp_path / "src.bin"
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    src.write_bytes(data)
+
+    LongPathShutil.copyfile(src, tmp_path / "dst.bin")
+    assert (tmp_path / "dst.bin").read_bytes() == data
+
+    def failing_copyfileobj(fsrc, fdst, length=0):
+        fdst.write(fsrc.read(1024))
+        raise OSError("copy failed")
+
+    monkeypatch.setattr(implementation, "_USE_SENDFILE", False)
+    monkeypatch.setattr(implementation, "_HAS_FCOPYFILE", False)
+    monkeypatch.setattr(implementation, "copyfileobj", failing_copyfileobj)
+    with pytest.raises(OSError, match="copy failed"):
+        LongPathShutil.copyfile(src, tmp_path / "partial.bin")
+    assert (tmp_path / "partial.bin").read_bytes() == data[:1024]
+
+def test_copytree_many(tmp_path, tree):
+    other = tmp_path / "other"
+    os.makedirs(other / "sub")
+    (other / "sub" / "x.txt").write_text("x")
+
+    result = LongPathShutil.copytree_many([(tree, tmp_path / "dst1"), (other, tmp_path / "dst2")])
+    assert result == [str(tmp_path / "dst1"), str(tmp_path / "dst2")]
+    shutil.copytree(tree, tmp_path / "expected1")
+    assert _snapshot(tmp_path / "dst1") == _snapshot(tmp_path / "expected1")
+    assert _snapshot(tmp_path / "dst2") == _snapshot(other)
+
+def test_copytree_many_existing_dst(tmp_path, tree):
+    os.makedirs(tmp_path / "dst2")
+
+    with pytest.raises(FileExistsError):
+        LongPathShutil.copytree_many([(tree, tmp_path / "dst1"), (tree, tmp_path / "dst2")])
+    assert not os.path.exists(tmp_path / "dst1")
+    with pytest.raises(ValueError):
+        LongPathShutil.copytree_many([(tree, tmp_path / "dst1"), (tree, tmp_path / "dst1")])
+    assert not os.path.exists(tmp_path / "dst1")
+
+    LongPathShutil.copytree_many(
+        [(tree, tmp_path / "dst1"), (tree, tmp_path / "dst2")], dirs_exist_ok=True
+    )
+    assert _snapshot(tmp_path / "dst1") == _snapshot(tmp_path / "dst2")
+
+def test_move_audit_hook_can_veto(tmp_path, monkeypatch):
+    def audit(event, *args):
+        if event == "shutil.move":
+            raise RuntimeError("move blocked")
+
+    monkeypatch.setattr(sys, "audit", audit)
+    for is_nt in (False, True):
+        monkeypatch.setattr(implementation, "_IS_NT", is_nt)
+        src, dst = tmp_path / "src.txt", tmp_path / "dst.txt"
+        src.write_text("data")
+        with pytest.raises(RuntimeError, match="move blocked"):
+            LongPathShutil.move(src, dst)
+        assert src.read_text() == "data"
+        assert not dst.exists()
+
+def test_move(tmp_path, monkeypatch):
+    for is_nt in (False, True):
+        monkeypatch.setattr(implementation, "_IS_NT", is_nt)
+        src, dst = tmp_path / "src.txt", tmp_path / f"dst{is_nt}.txt"
+        src.write_text("data")
+        LongPathShutil.move(src, dst)
+        assert dst.read_text() == "data" and not src.exists()
+
+        # os.replace can't replace a directory, so shutil.move takes over
+        src.write_text("data")
+        os.makedirs(tmp_path / f"dir{is_nt}")
+        LongPathShutil.move(src, tmp_path / f"dir{is_nt}")
+        assert (tmp_path / f"dir{is_nt}" / "src.txt").read_text() == "data"
+
+def test_copyfile_buffer_size(tmp_path, monkeypatch):
+    lengths = []
+
+    def recording_copyfileobj(fsrc, fdst, length=0):
+        lengths.append(length)
+        shutil.copyfileobj(fsrc, fdst)
+
+    monkeypatch.setattr(implementation, "_USE_SENDFILE", False)
+    monkeypatch.setattr(implementation, "_HAS_FCOPYFILE", False)
+    monkeypatch.setattr(implementation, "copyfileobj", recording_copyfileobj)
+    (tmp_path / "small.txt").write_bytes(b"x" * 100)
+    (tmp_path / "large.bin").write_bytes(b"x" * (2 * 1024 * 1024))
+    LongPathShutil.copyfile(tmp_path / "small.txt", tmp_path / "small_copy.txt")
+    LongPathShutil.copyfile(tmp_path / "large.bin", tmp_path / "large_copy.bin")
+    assert lengths == [100, 1024 * 1024]
+    assert (tmp_path / "large_copy.bin").read_bytes() == b"x" * (2 * 1024 * 1024)
+
+def test_copyfileobj_partial_chunk():
+    data = os.urandom(10 * 1000 + 7)
+    fdst = io.BytesIO()
+    LongPathShutil.copyfileobj(io.BytesIO(data), fdst, length=1000)
+    assert fdst.getvalue() == data
+
+def test_copyfileobj_short_reads():
+    class ShortReader(io.RawIOBase):
+        def __init__(self, data):
+            self.data = data
+
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            # never more than 3 bytes at a time
+            n = min(3, len(b), len(self.data))
+            b[:n] = self.data[:n]
+            self.data = self.data[n:]
+            return n
+
+    data = os.urandom(1000)
+    fdst = io.BytesIO()
+    LongPathShutil.copyfileobj(ShortReader(data), fdst, length=64)
+    assert fdst.getvalue() == data
+
+def test_copyfileobj_text_stream():
+    fdst = io.StringIO()
+    LongPathShutil.copyfileobj(io.StringIO("some text\n" * 100), fdst, length=16)
+    assert fdst.getvalue() == "some text\n" * 100
+
+def test_copytree_into_existing_dir_over_file(tmp_path):
+    # a file in src whose counterpart in an existing dst is a directory gets copied into it
+    os.makedirs(tmp_path / "s")
+    (tmp_path / "s" / "g").write_text("g")
+    for name in ("d", "expected"):
+        os.makedirs(tmp_path / name / "g")
+    LongPathShutil.copytree(tmp_path / "s", tmp_path / "d", dirs_exist_ok=True)
+    shutil.copytree(tmp_path / "s", tmp_path / "expected", dirs_exist_ok=True)
+    assert _snapshot(tmp_path / "d") == _snapshot(tmp_path / "expected")
+    assert (tmp_path / "d" / "g" / "g").read_text() == "g"